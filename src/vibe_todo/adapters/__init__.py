@@ -1,10 +1,21 @@
 """仓储抽象接口"""
+import sys
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import List, Optional
+from datetime import datetime
+from typing import Iterator, List, Optional
 
 from ..core.models import Task, TaskPriority, TaskStatus
 
+# 解析远端 API 返回的 ISO 8601 时间（Python 3.11+ 原生支持结尾的 "Z"）
+if sys.version_info >= (3, 11):
+    parse_iso_datetime = datetime.fromisoformat
+else:
+    def parse_iso_datetime(value: str) -> datetime:
+        if value.endswith("Z"):
+            value = value[:-1] + "+00:00"
+        return datetime.fromisoformat(value)
+
 
 @dataclass
 class TaskFilter:
@@ -47,11 +58,37 @@ class TaskRepositoryInterface(ABC):
         """列出所有任务，可按状态筛选"""
         pass
 
+    def iter_all(self, status: Optional[TaskStatus] = None) -> Iterator[Task]:
+        """逐个产出任务，可按状态筛选
+
+        默认实现基于 list_all，分页获取的后端可以覆盖此方法以流式返回
+        """
+        yield from self.list_all(status)
+
     @abstractmethod
     def delete(self, task_id) -> bool:
         """删除任务"""
         pass
 
+    def get_many(self, task_ids: List) -> List[Task]:
+        """批量获取任务，忽略不存在的 ID，结果顺序与 task_ids 一致
+
+        默认实现逐个调用 get_by_id，远程后端可以覆盖此方法以并发请求
+        """
+        tasks = [self.get_by_id(task_id) for task_id in task_ids]
+        return [task for task in tasks if task is not None]
+
+    def save_many(self, tasks: List[Task]) -> List[Task]:
+        """批量保存或更新任务
+
+        默认实现逐个调用 save，支持批量接口的后端可以覆盖此方法
+        """
+        return [self.save(task) for task in tasks]
+
+    def delete_many(self, task_ids: List) -> int:
+        """批量删除任务，返回成功删除的数量"""
+        return sum(1 for task_id in task_ids if self.delete(task_id))
+
     def search(self, query: str) -> List[Task]:
         """全文搜索任务
         
@@ -81,35 +118,12 @@ class TaskRepositoryInterface(ABC):
         Returns:
             符合条件的任务列表
         """
-        # 默认实现：在内存中过滤
-        tasks = self.list_all()
-
-        if task_filter.status:
-            tasks = [t for t in tasks if t.status == task_filter.status]
-
-        if task_filter.priority:
-            tasks = [t for t in tasks if t.priority == task_filter.priority]
-
-        if task_filter.project:
-            tasks = [t for t in tasks if t.project == task_filter.project]
-
-        if task_filter.tags:
-            if task_filter.tags_operator == "AND":
-                tasks = [t for t in tasks if all(tag in t.tags for tag in task_filter.tags)]
-            else:  # OR
-                tasks = [t for t in tasks if any(tag in t.tags for tag in task_filter.tags)]
-
-        if task_filter.overdue_only:
-            tasks = [t for t in tasks if t.is_overdue()]
-
-        if task_filter.due_in_days is not None:
-            tasks = [
-                t for t in tasks
-                if t.due_date and t.days_until_due() is not None
-                and 0 <= t.days_until_due() <= task_filter.due_in_days
-            ]
-
-        return tasks
+        # 默认实现：在内存中单遍过滤
+        now = Task._get_now_aware()
+        return [
+            task for task in self.iter_all()
+            if self._filter_single_task(task, task_filter, now)
+        ]
 
     def search_and_filter(self, query: Optional[str] = None, task_filter: Optional[TaskFilter] = None) -> List[Task]:
         """组合搜索和过滤
@@ -144,8 +158,13 @@ class TaskRepositoryInterface(ABC):
 
         return tasks
 
-    def _filter_single_task(self, task: Task, task_filter: TaskFilter) -> bool:
-        """过滤单个任务（内部辅助方法）"""
+    def _filter_single_task(self, task: Task, task_filter: TaskFilter,
+                            now: Optional[datetime] = None) -> bool:
+        """过滤单个任务（内部辅助方法）
+
+        Args:
+            now: 当前时间（带时区，批量过滤时只获取一次）
+        """
         if task_filter.status and task.status != task_filter.status:
             return False
 
@@ -163,12 +182,12 @@ class TaskRepositoryInterface(ABC):
                 if not any(tag in task.tags for tag in task_filter.tags):
                     return False
 
-        if task_filter.overdue_only and not task.is_overdue():
+        if task_filter.overdue_only and not task.is_overdue(now):
             return False
 
         if task_filter.due_in_days is not None:
-            if not (task.due_date and task.days_until_due() is not None
-                   and 0 <= task.days_until_due() <= task_filter.due_in_days):
+            days = task.days_until_due(now)
+            if days is None or not 0 <= days <= task_filter.due_in_days:
                 return False
 
         return True
@@ -1,26 +1,114 @@
 """Microsoft To Do 后端适配器"""
-import json
 import os
-from datetime import datetime
-from typing import List, Optional
+import time
+from typing import Iterator, List, Optional
+from urllib.parse import quote, urlencode
 
+from .. import fastjson
 from ..core.models import Task, TaskPriority, TaskStatus
-from . import TaskRepositoryInterface
+from . import TaskRepositoryInterface, parse_iso_datetime
+
+GRAPH_BASE_URL = "https://graph.microsoft.com/v1.0"
+
+# Microsoft Graph JSON batching 端点，单次最多 20 个子请求
+BATCH_URL = f"{GRAPH_BASE_URL}/$batch"
+BATCH_LIMIT = 20
+
+# token 提前 5 分钟视为过期，避免请求途中失效
+TOKEN_EXPIRY_BUFFER = 300
+
+# 状态/优先级映射表
+_STATUS_TO_MSTODO = {
+    TaskStatus.TODO: "notStarted",
+    TaskStatus.IN_PROGRESS: "inProgress",
+    TaskStatus.DONE: "completed",
+}
+_MSTODO_TO_STATUS = {v: k for k, v in _STATUS_TO_MSTODO.items()}
+
+_PRIORITY_TO_MSTODO = {
+    TaskPriority.LOW: "low",
+    TaskPriority.MEDIUM: "normal",
+    TaskPriority.HIGH: "high",
+    TaskPriority.URGENT: "high",  # Microsoft 只有三级
+}
+_MSTODO_TO_PRIORITY = {
+    "low": TaskPriority.LOW,
+    "normal": TaskPriority.MEDIUM,
+    "high": TaskPriority.HIGH,
+}
+
+# list_all 只请求 _mstodo_to_task 用到的字段，并加大分页大小（默认分页较小）
+_SELECT_FIELDS = (
+    "id,title,body,status,importance,dueDateTime,categories,"
+    "createdDateTime,lastModifiedDateTime"
+)
+_PAGE_SIZE = 100
+
+
+def _list_query(mstodo_status: Optional[str] = None) -> str:
+    """生成 list_all 的查询串"""
+    params = {"$select": _SELECT_FIELDS, "$top": _PAGE_SIZE}
+    if mstodo_status:
+        params["$filter"] = f"status eq '{mstodo_status}'"
+    return "?" + urlencode(params, safe="$',", quote_via=quote)
+
+
+# 各状态对应的查询串（None 表示不筛选）
+_LIST_QUERY = {None: _list_query()}
+_LIST_QUERY.update(
+    (status, _list_query(mstodo_status)) for status, mstodo_status in _STATUS_TO_MSTODO.items()
+)
+
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _json_body(body) -> dict:
+    """生成 JSON 请求体参数（使用 fastjson 序列化，替代 requests 内部的 json.dumps）"""
+    return {"data": fastjson.dumps_bytes(body), "headers": _JSON_HEADERS}
+
+
+def _build_retry():
+    """创建会话的重试策略
+
+    GET/PATCH/DELETE 遇到限流或服务端错误时按指数退避重试；
+    429 表示请求未被处理，POST（创建任务、$batch）也可以安全重试，并遵循 Retry-After。
+    重试耗尽后返回最后一次响应，由调用方按状态码抛出 RuntimeError。
+    """
+    from urllib3.util.retry import Retry
+
+    class _RateLimitRetry(Retry):
+        def is_retry(self, method, status_code, has_retry_after=False):
+            if status_code == 429:
+                return bool(self.total)
+            return super().is_retry(method, status_code, has_retry_after)
+
+    return _RateLimitRetry(
+        total=5,
+        backoff_factor=0.25,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET", "PATCH", "DELETE"],
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
 
 
 class MicrosoftRepository(TaskRepositoryInterface):
     """Microsoft To Do 适配器"""
 
-    def __init__(self, client_id: str, list_id: str = None, token_cache_path: str = ".mstodo_token"):
+    def __init__(self, client_id: str, list_id: str = None, token_cache_path: str = ".mstodo_token",
+                 cached_list_id: str = None):
         """
         Args:
             client_id: Azure AD Application (client) ID
             list_id: To Do List ID (默认使用 "tasks" 列表)
             token_cache_path: Token 缓存文件路径
+            cached_list_id: 缓存的默认列表 ID（未指定 list_id 时使用，跳过查询）
         """
         try:
             import requests
-            from msal import PublicClientApplication
+            from msal import PublicClientApplication, SerializableTokenCache
+            from requests.adapters import HTTPAdapter
         except ImportError:
             raise ImportError("请安装依赖: uv pip install msal requests")
 
@@ -28,33 +116,87 @@ class MicrosoftRepository(TaskRepositoryInterface):
         self.list_id = list_id
         self.token_cache_path = token_cache_path
         self.token = None
-        self.requests = __import__('requests')
 
-        # 初始化 MSAL
+        # 复用 TLS 连接（keep-alive），并对限流/服务端错误自动重试
+        # POST 只在 429 时重试，避免服务端错误时重复创建任务
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=_build_retry(),
+        ))
+
+        # 初始化 MSAL，持久化其 token 缓存以便跨进程静默刷新
+        cache_data = self._load_token_cache()
+        self.msal_cache = SerializableTokenCache()
+        if cache_data.get("msal_cache"):
+            self.msal_cache.deserialize(cache_data["msal_cache"])
         self.app = PublicClientApplication(
             client_id=client_id,
-            authority="https://login.microsoftonline.com/common"
+            authority="https://login.microsoftonline.com/common",
+            token_cache=self.msal_cache,
         )
 
         self._authenticate()
 
-        # 如果没有指定 list_id，获取默认列表
-        if not self.list_id:
-            self.list_id = self._get_default_list_id()
+        # 如果没有指定 list_id，优先使用缓存的默认列表，否则查询并缓存
+        self._using_cached_list_id = False
+        if self.list_id:
+            self._set_list_id(self.list_id)
+        elif cached_list_id:
+            self._set_list_id(cached_list_id)
+            self._using_cached_list_id = True
+        else:
+            self._refresh_default_list_id()
+
+    def _set_list_id(self, list_id: str):
+        """设置列表 ID，并预先生成任务相关的 URL"""
+        self.list_id = list_id
+        self._tasks_path = f"/me/todo/lists/{list_id}/tasks"
+        self._tasks_url = GRAPH_BASE_URL + self._tasks_path
+        self._list_urls = {status: self._tasks_url + query for status, query in _LIST_QUERY.items()}
+
+    def _refresh_default_list_id(self):
+        """查询默认列表 ID 并缓存到配置文件"""
+        self._set_list_id(self._get_default_list_id())
+        self._using_cached_list_id = False
+        self._cache_default_list_id()
+
+    def _cache_default_list_id(self):
+        """将默认列表 ID 缓存到配置文件"""
+        try:
+            from ..config import get_config
+            config = get_config()
+            config.update_backend_config(
+                "microsoft",
+                default_list_id=self.list_id
+            )
+        except Exception:
+            # 缓存失败不影响主流程
+            pass
 
-    def _authenticate(self):
-        """OAuth2 认证"""
-        # 尝试从缓存加载 token
+    def _load_token_cache(self) -> dict:
+        """读取 token 缓存文件"""
         if os.path.exists(self.token_cache_path):
             try:
-                with open(self.token_cache_path, 'r') as f:
-                    cache_data = json.load(f)
-                    self.token = cache_data.get("access_token")
-                    # 简单验证 token 是否有效
-                    if self._verify_token():
-                        return
+                with open(self.token_cache_path, 'rb') as f:
+                    return fastjson.loads(f.read())
             except Exception:
                 pass
+        return {}
+
+    def _authenticate(self, force: bool = False):
+        """OAuth2 认证
+
+        Args:
+            force: 忽略缓存的 access token 强制刷新（收到 401 时使用）
+        """
+        # 缓存的 token 未过期时直接使用，不发起验证请求
+        if not force:
+            cache_data = self._load_token_cache()
+            if cache_data.get("access_token") and cache_data.get("expires_at", 0) > time.time():
+                self._set_token(cache_data["access_token"])
+                return
 
         # 需要重新认证
         scopes = ["Tasks.ReadWrite", "User.Read"]
@@ -62,9 +204,11 @@ class MicrosoftRepository(TaskRepositoryInterface):
         # 先尝试静默获取
         accounts = self.app.get_accounts()
         if accounts:
-            result = self.app.acquire_token_silent(scopes, account=accounts[0])
+            result = self.app.acquire_token_silent(
+                scopes, account=accounts[0], force_refresh=force
+            )
             if result and "access_token" in result:
-                self.token = result["access_token"]
+                self._set_token(result["access_token"])
                 self._save_token(result)
                 return
 
@@ -72,42 +216,42 @@ class MicrosoftRepository(TaskRepositoryInterface):
         result = self.app.acquire_token_interactive(scopes=scopes)
 
         if "access_token" in result:
-            self.token = result["access_token"]
+            self._set_token(result["access_token"])
             self._save_token(result)
         else:
             raise RuntimeError(f"认证失败: {result.get('error_description', 'Unknown error')}")
 
-    def _verify_token(self) -> bool:
-        """验证 token 是否有效"""
-        try:
-            headers = {"Authorization": f"Bearer {self.token}"}
-            response = self.requests.get(
-                "https://graph.microsoft.com/v1.0/me",
-                headers=headers,
-                timeout=5
-            )
-            return response.status_code == 200
-        except Exception:
-            return False
+    def _set_token(self, token: str):
+        """设置 access token，并写入会话的默认请求头"""
+        self.token = token
+        self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def _request(self, method: str, url: str, **kwargs):
+        """发送请求，token 失效（401）时刷新后重试一次"""
+        send = getattr(self.session, method)
+        response = send(url, **kwargs)
+        if response.status_code == 401:
+            self._authenticate(force=True)
+            response = send(url, **kwargs)
+        return response
 
     def _save_token(self, result: dict):
         """保存 token 到缓存"""
         try:
             with open(self.token_cache_path, 'w') as f:
-                json.dump({
+                f.write(fastjson.dumps({
                     "access_token": result["access_token"],
-                    "expires_at": datetime.now().timestamp() + result.get("expires_in", 3600)
-                }, f)
+                    "expires_at": (
+                        time.time() + result.get("expires_in", 3600) - TOKEN_EXPIRY_BUFFER
+                    ),
+                    "msal_cache": self.msal_cache.serialize(),
+                }))
         except Exception:
             pass
 
     def _get_default_list_id(self) -> str:
         """获取默认任务列表 ID"""
-        headers = {"Authorization": f"Bearer {self.token}"}
-        response = self.requests.get(
-            "https://graph.microsoft.com/v1.0/me/todo/lists",
-            headers=headers
-        )
+        response = self._request("get", f"{GRAPH_BASE_URL}/me/todo/lists")
 
         if response.status_code == 200:
             lists = response.json()["value"]
@@ -153,9 +297,8 @@ class MicrosoftRepository(TaskRepositoryInterface):
         """将 Microsoft To Do 任务转换为 Task 对象"""
         # 提取基本信息
         title = mstodo_task.get("title", "")
-        description = ""
-        if mstodo_task.get("body"):
-            description = mstodo_task["body"].get("content", "")
+        body = mstodo_task.get("body")
+        description = body.get("content", "") if body else ""
 
         # 状态
         status = self._map_mstodo_to_status(mstodo_task.get("status", "notStarted"))
@@ -164,21 +307,15 @@ class MicrosoftRepository(TaskRepositoryInterface):
         priority = self._map_mstodo_to_priority(mstodo_task.get("importance", "normal"))
 
         # 截止日期
-        due_date = None
-        if mstodo_task.get("dueDateTime"):
-            due_str = mstodo_task["dueDateTime"]["dateTime"]
-            due_date = datetime.fromisoformat(due_str.replace("Z", "+00:00"))
+        due = mstodo_task.get("dueDateTime")
+        due_date = parse_iso_datetime(due["dateTime"]) if due else None
 
         # 标签
         tags = mstodo_task.get("categories", [])
 
         # 时间戳
-        created_at = datetime.fromisoformat(
-            mstodo_task["createdDateTime"].replace("Z", "+00:00")
-        )
-        updated_at = datetime.fromisoformat(
-            mstodo_task["lastModifiedDateTime"].replace("Z", "+00:00")
-        )
+        created_at = parse_iso_datetime(mstodo_task["createdDateTime"])
+        updated_at = parse_iso_datetime(mstodo_task["lastModifiedDateTime"])
 
         # Microsoft To Do 不支持工时，使用扩展属性存储（这里简化处理）
         time_spent = 0
@@ -202,57 +339,30 @@ class MicrosoftRepository(TaskRepositoryInterface):
 
     def _map_status_to_mstodo(self, status: TaskStatus) -> str:
         """映射状态到 Microsoft To Do"""
-        mapping = {
-            TaskStatus.TODO: "notStarted",
-            TaskStatus.IN_PROGRESS: "inProgress",
-            TaskStatus.DONE: "completed",
-        }
-        return mapping[status]
+        return _STATUS_TO_MSTODO[status]
 
     def _map_mstodo_to_status(self, mstodo_status: str) -> TaskStatus:
         """映射 Microsoft To Do 状态到内部状态"""
-        mapping = {
-            "notStarted": TaskStatus.TODO,
-            "inProgress": TaskStatus.IN_PROGRESS,
-            "completed": TaskStatus.DONE,
-        }
-        return mapping.get(mstodo_status, TaskStatus.TODO)
+        return _MSTODO_TO_STATUS.get(mstodo_status, TaskStatus.TODO)
 
     def _map_priority_to_mstodo(self, priority: TaskPriority) -> str:
         """映射优先级到 Microsoft To Do"""
-        mapping = {
-            TaskPriority.LOW: "low",
-            TaskPriority.MEDIUM: "normal",
-            TaskPriority.HIGH: "high",
-            TaskPriority.URGENT: "high",  # Microsoft 只有三级
-        }
-        return mapping[priority]
+        return _PRIORITY_TO_MSTODO[priority]
 
     def _map_mstodo_to_priority(self, mstodo_priority: str) -> TaskPriority:
         """映射 Microsoft To Do 优先级到内部优先级"""
-        mapping = {
-            "low": TaskPriority.LOW,
-            "normal": TaskPriority.MEDIUM,
-            "high": TaskPriority.HIGH,
-        }
-        return mapping.get(mstodo_priority, TaskPriority.MEDIUM)
+        return _MSTODO_TO_PRIORITY.get(mstodo_priority, TaskPriority.MEDIUM)
 
     def save(self, task: Task) -> Task:
         """保存或更新任务"""
-        headers = {
-            "Authorization": f"Bearer {self.token}",
-            "Content-Type": "application/json"
-        }
         body = self._task_to_mstodo(task)
 
         if task.id:
             # 更新现有任务
-            url = f"https://graph.microsoft.com/v1.0/me/todo/lists/{self.list_id}/tasks/{task.id}"
-            response = self.requests.patch(url, json=body, headers=headers)
+            response = self._request("patch", f"{self._tasks_url}/{task.id}", **_json_body(body))
         else:
             # 创建新任务
-            url = f"https://graph.microsoft.com/v1.0/me/todo/lists/{self.list_id}/tasks"
-            response = self.requests.post(url, json=body, headers=headers)
+            response = self._request("post", self._tasks_url, **_json_body(body))
 
         if response.status_code in [200, 201]:
             return self._mstodo_to_task(response.json())
@@ -261,10 +371,7 @@ class MicrosoftRepository(TaskRepositoryInterface):
 
     def get_by_id(self, task_id: str) -> Optional[Task]:
         """根据 ID 获取任务"""
-        headers = {"Authorization": f"Bearer {self.token}"}
-        url = f"https://graph.microsoft.com/v1.0/me/todo/lists/{self.list_id}/tasks/{task_id}"
-
-        response = self.requests.get(url, headers=headers)
+        response = self._request("get", f"{self._tasks_url}/{task_id}")
 
         if response.status_code == 200:
             return self._mstodo_to_task(response.json())
@@ -272,28 +379,107 @@ class MicrosoftRepository(TaskRepositoryInterface):
 
     def list_all(self, status: Optional[TaskStatus] = None) -> List[Task]:
         """列出所有任务，可按状态筛选"""
-        headers = {"Authorization": f"Bearer {self.token}"}
-        url = f"https://graph.microsoft.com/v1.0/me/todo/lists/{self.list_id}/tasks"
+        return list(self.iter_all(status))
 
-        # Microsoft Graph API 支持 $filter
-        if status:
-            mstodo_status = self._map_status_to_mstodo(status)
-            url += f"?$filter=status eq '{mstodo_status}'"
+    def iter_all(self, status: Optional[TaskStatus] = None) -> Iterator[Task]:
+        """逐个产出任务，自动跟随 @odata.nextLink 分页"""
+        # Microsoft Graph API 支持 $filter/$select/$top
+        response = self._request("get", self._list_urls[status])
 
-        response = self.requests.get(url, headers=headers)
+        # 缓存的默认列表已被删除：重新查询后重试一次
+        if response.status_code == 404 and self._using_cached_list_id:
+            self._refresh_default_list_id()
+            response = self._request("get", self._list_urls[status])
 
-        if response.status_code == 200:
-            tasks = []
-            for mstodo_task in response.json()["value"]:
-                tasks.append(self._mstodo_to_task(mstodo_task))
-            return tasks
-        else:
-            raise RuntimeError(f"查询任务失败: {response.text}")
+        while True:
+            if response.status_code != 200:
+                raise RuntimeError(f"查询任务失败: {response.text}")
+
+            data = fastjson.loads(response.content)
+            for mstodo_task in data["value"]:
+                yield self._mstodo_to_task(mstodo_task)
+
+            next_link = data.get("@odata.nextLink")
+            if not next_link:
+                break
+            response = self._request("get", next_link)
 
     def delete(self, task_id: str) -> bool:
         """删除任务"""
-        headers = {"Authorization": f"Bearer {self.token}"}
-        url = f"https://graph.microsoft.com/v1.0/me/todo/lists/{self.list_id}/tasks/{task_id}"
-
-        response = self.requests.delete(url, headers=headers)
+        response = self._request("delete", f"{self._tasks_url}/{task_id}")
         return response.status_code == 204
+
+    def _batch(self, sub_requests: List[dict]) -> List[dict]:
+        """通过 JSON batching 发送请求，每批最多 20 个子请求
+
+        Args:
+            sub_requests: 子请求列表（method、url、可选 body）
+
+        Returns:
+            与 sub_requests 顺序一致的子响应列表
+        """
+        responses = []
+
+        for start in range(0, len(sub_requests), BATCH_LIMIT):
+            chunk = sub_requests[start:start + BATCH_LIMIT]
+            payload = {"requests": []}
+            for i, sub in enumerate(chunk):
+                item = {"id": str(i), "method": sub["method"], "url": sub["url"]}
+                if "body" in sub:
+                    item["headers"] = {"Content-Type": "application/json"}
+                    item["body"] = sub["body"]
+                payload["requests"].append(item)
+
+            response = self._request("post", BATCH_URL, **_json_body(payload))
+            if response.status_code != 200:
+                raise RuntimeError(f"批量请求失败: {response.text}")
+
+            # 子响应的顺序不保证与请求一致，按 id 还原
+            by_id = {r["id"]: r for r in response.json()["responses"]}
+            responses.extend(by_id[str(i)] for i in range(len(chunk)))
+
+        return responses
+
+    def get_many(self, task_ids: List[str]) -> List[Task]:
+        """批量获取任务（使用 $batch 合并请求），忽略不存在的 ID"""
+        sub_requests = [
+            {"method": "GET", "url": f"{self._tasks_path}/{task_id}"}
+            for task_id in task_ids
+        ]
+        return [
+            self._mstodo_to_task(r["body"])
+            for r in self._batch(sub_requests)
+            if r["status"] == 200
+        ]
+
+    def save_many(self, tasks: List[Task]) -> List[Task]:
+        """批量保存或更新任务（使用 $batch 合并请求）"""
+        sub_requests = []
+        for task in tasks:
+            if task.id:
+                sub_requests.append({
+                    "method": "PATCH",
+                    "url": f"{self._tasks_path}/{task.id}",
+                    "body": self._task_to_mstodo(task),
+                })
+            else:
+                sub_requests.append({
+                    "method": "POST",
+                    "url": self._tasks_path,
+                    "body": self._task_to_mstodo(task),
+                })
+
+        saved = []
+        for sub_response in self._batch(sub_requests):
+            if sub_response["status"] not in (200, 201):
+                raise RuntimeError(f"保存任务失败: {sub_response.get('body')}")
+            saved.append(self._mstodo_to_task(sub_response["body"]))
+        return saved
+
+    def delete_many(self, task_ids: List[str]) -> int:
+        """批量删除任务（使用 $batch 合并请求）"""
+        sub_requests = [
+            {"method": "DELETE", "url": f"{self._tasks_path}/{task_id}"}
+            for task_id in task_ids
+        ]
+        return sum(1 for r in self._batch(sub_requests) if r["status"] == 204)
@@ -1,31 +1,104 @@
 """Notion 后端适配器"""
-from datetime import datetime
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional
 
+from .. import fastjson
 from ..core.models import Task, TaskPriority, TaskStatus
-from . import TaskRepositoryInterface
+from . import TaskFilter, TaskRepositoryInterface, parse_iso_datetime
+from .notion_cache import NotionQueryCache
+
+# 并发请求数上限（Notion API 平均限速约 3 次/秒，过高只会触发 429 重试）
+MAX_CONCURRENT_REQUESTS = 4
+
+# get_many 的 ID 数超过单页大小时改为扫描数据库
+# （Notion 查询不支持按页面 ID 过滤，扫描每次请求取 100 条，少于逐个 retrieve 的请求数）
+_GET_MANY_SCAN_THRESHOLD = 100
+
+# 空描述的属性值，只读共享（notion-client 只做序列化，不会修改）
+_EMPTY_RICH_TEXT = {"rich_text": []}
+
+# 状态/优先级映射表
+_STATUS_TO_NOTION = {
+    TaskStatus.TODO: "To Do",
+    TaskStatus.IN_PROGRESS: "In Progress",
+    TaskStatus.DONE: "Done",
+}
+_NOTION_TO_STATUS = {v: k for k, v in _STATUS_TO_NOTION.items()}
+
+_PRIORITY_TO_NOTION = {
+    TaskPriority.LOW: "Low",
+    TaskPriority.MEDIUM: "Medium",
+    TaskPriority.HIGH: "High",
+    TaskPriority.URGENT: "Urgent",
+}
+_NOTION_TO_PRIORITY = {v: k for k, v in _PRIORITY_TO_NOTION.items()}
+
+# 状态/优先级的属性值只有 7 种，预先构造后只读共享
+_STATUS_PROPERTIES = {k: {"select": {"name": v}} for k, v in _STATUS_TO_NOTION.items()}
+_PRIORITY_PROPERTIES = {k: {"select": {"name": v}} for k, v in _PRIORITY_TO_NOTION.items()}
+
+
+# 进程内共享的 HTTP 连接池（Web 服务每个请求都会创建新的仓储实例）
+_http_client = None
+
+
+def _get_http_client():
+    """获取共享的 httpx 客户端，分页查询等连续请求复用同一 TLS 连接（重试由 notion-client 处理）"""
+    global _http_client
+    if _http_client is None:
+        import httpx  # notion-client 的依赖
+
+        _http_client = httpx.Client(
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=MAX_CONCURRENT_REQUESTS)
+        )
+    return _http_client
+
+
+def _use_fast_json(client):
+    """安装了 orjson 时，用 fastjson 解析 notion-client 的成功响应
+
+    notion-client 内部通过 response.json()（标准库 json）解析响应，
+    这里替换实例上的 _parse_response，错误响应仍交给原方法处理
+    """
+    if fastjson.orjson is None or not hasattr(type(client), "_parse_response"):
+        return
+
+    parse_response = client._parse_response
+
+    def _parse_response_fast(response):
+        if response.is_success:
+            return fastjson.loads(response.content)
+        return parse_response(response)
+
+    client._parse_response = _parse_response_fast
 
 
 class NotionRepository(TaskRepositoryInterface):
     """Notion 数据库适配器"""
 
-    def __init__(self, token: str, database_id: str, verify: bool = False, cached_data_source_id: str = None):
+    def __init__(self, token: str, database_id: str, verify: bool = False, cached_data_source_id: str = None,
+                 cache_path: str = None):
         """
         Args:
             token: Notion Integration Token
             database_id: Notion Database ID
             verify: 是否在初始化时验证数据库访问（默认 False，延迟到首次使用）
             cached_data_source_id: 缓存的 data_source_id（如果提供则跳过查询）
+            cache_path: 查询结果缓存文件路径（默认不启用缓存）
         """
         try:
             from notion_client import Client
         except ImportError:
             raise ImportError("请安装 notion-client: uv pip install notion-client")
 
-        self.client = Client(auth=token)
+        self.client = Client(auth=token, client=_get_http_client())
+        _use_fast_json(self.client)
         self.database_id = database_id
         self.data_source_id = cached_data_source_id  # 使用缓存的 data_source_id
         self._verified = bool(cached_data_source_id)  # 如果有缓存则标记为已验证
+        self._data_source_from_cache = bool(cached_data_source_id)
+        self.query_cache = NotionQueryCache(cache_path) if cache_path else None
 
         # 可选的立即验证（用于配置测试等场景）
         if verify:
@@ -60,6 +133,21 @@ class NotionRepository(TaskRepositoryInterface):
         except Exception as e:
             raise RuntimeError(f"无法访问 Notion 数据库: {e}")
 
+    def _query_data_source(self, query_params: dict) -> dict:
+        """查询 data source；缓存的 data_source_id 失效（400/404）时重新获取并重试一次"""
+        try:
+            return self.client.data_sources.query(**query_params)
+        except Exception as e:
+            if not self._data_source_from_cache or getattr(e, "status", None) not in (400, 404):
+                raise
+
+        # 重新获取 data_source_id 并写回配置文件
+        self._data_source_from_cache = False
+        self.data_source_id = None
+        self._ensure_data_source()
+        query_params["data_source_id"] = self.data_source_id
+        return self.client.data_sources.query(**query_params)
+
     def _cache_data_source_id(self):
         """将 data_source_id 缓存到配置文件"""
         try:
@@ -75,22 +163,21 @@ class NotionRepository(TaskRepositoryInterface):
 
     def _task_to_properties(self, task: Task) -> dict:
         """将 Task 转换为 Notion 属性格式"""
+        description = task.description
         properties = {
             "Name": {
                 "title": [{"text": {"content": task.title}}]
             },
-            "Description": {
-                "rich_text": [{"text": {"content": task.description}}]
-            } if task.description else {"rich_text": []},
-            "Status": {
-                "select": {"name": self._map_status_to_notion(task.status)}
-            },
-            "Priority": {
-                "select": {"name": self._map_priority_to_notion(task.priority)}
-            },
+            "Status": _STATUS_PROPERTIES[task.status],
+            "Priority": _PRIORITY_PROPERTIES[task.priority],
             "Time Spent": {
                 "number": task.time_spent
             },
+            # 描述（为空时复用共享的空值）
+            "Description": (
+                {"rich_text": [{"text": {"content": description}}]}
+                if description else _EMPTY_RICH_TEXT
+            ),
         }
 
         # 截止日期
@@ -117,46 +204,48 @@ class NotionRepository(TaskRepositoryInterface):
         """将 Notion 页面转换为 Task 对象"""
         props = page["properties"]
 
+        # 每个字段只查找一次属性，缺失时不构造空字典；状态/优先级直接查映射表
         # 提取标题
-        title = ""
-        if props.get("Name", {}).get("title"):
-            title = props["Name"]["title"][0]["text"]["content"]
+        p = props.get("Name")
+        title = p["title"][0]["text"]["content"] if p and p.get("title") else ""
 
         # 提取描述
-        description = ""
-        if props.get("Description", {}).get("rich_text"):
-            description = props["Description"]["rich_text"][0]["text"]["content"]
+        p = props.get("Description")
+        description = p["rich_text"][0]["text"]["content"] if p and p.get("rich_text") else ""
 
         # 提取状态
-        status_name = props.get("Status", {}).get("select", {}).get("name", "To Do")
-        status = self._map_notion_to_status(status_name)
+        p = props.get("Status")
+        status = (
+            _NOTION_TO_STATUS.get(p["select"]["name"], TaskStatus.TODO)
+            if p and p.get("select") else TaskStatus.TODO
+        )
 
         # 提取优先级
-        priority_name = props.get("Priority", {}).get("select", {}).get("name", "Medium")
-        priority = self._map_notion_to_priority(priority_name)
+        p = props.get("Priority")
+        priority = (
+            _NOTION_TO_PRIORITY.get(p["select"]["name"], TaskPriority.MEDIUM)
+            if p and p.get("select") else TaskPriority.MEDIUM
+        )
 
         # 提取工时
-        time_spent = props.get("Time Spent", {}).get("number", 0)
+        p = props.get("Time Spent")
+        time_spent = (p.get("number") or 0) if p else 0
 
         # 提取截止日期
-        due_date = None
-        if props.get("Due Date", {}).get("date"):
-            due_str = props["Due Date"]["date"]["start"]
-            due_date = datetime.fromisoformat(due_str.replace("Z", "+00:00"))
+        p = props.get("Due Date")
+        due_date = parse_iso_datetime(p["date"]["start"]) if p and p.get("date") else None
 
         # 提取标签
-        tags = []
-        if props.get("Tags", {}).get("multi_select"):
-            tags = [tag["name"] for tag in props["Tags"]["multi_select"]]
+        p = props.get("Tags")
+        tags = [tag["name"] for tag in p["multi_select"]] if p and p.get("multi_select") else []
 
         # 提取项目
-        project = None
-        if props.get("Project", {}).get("select"):
-            project = props["Project"]["select"]["name"]
+        p = props.get("Project")
+        project = p["select"]["name"] if p and p.get("select") else None
 
         # 提取时间戳
-        created_at = datetime.fromisoformat(page["created_time"].replace("Z", "+00:00"))
-        updated_at = datetime.fromisoformat(page["last_edited_time"].replace("Z", "+00:00"))
+        created_at = parse_iso_datetime(page["created_time"])
+        updated_at = parse_iso_datetime(page["last_edited_time"])
 
         return Task(
             task_id=page["id"],
@@ -174,44 +263,23 @@ class NotionRepository(TaskRepositoryInterface):
 
     def _map_status_to_notion(self, status: TaskStatus) -> str:
         """映射状态到 Notion"""
-        mapping = {
-            TaskStatus.TODO: "To Do",
-            TaskStatus.IN_PROGRESS: "In Progress",
-            TaskStatus.DONE: "Done",
-        }
-        return mapping[status]
+        return _STATUS_TO_NOTION[status]
 
     def _map_notion_to_status(self, notion_status: str) -> TaskStatus:
         """映射 Notion 状态到内部状态"""
-        mapping = {
-            "To Do": TaskStatus.TODO,
-            "In Progress": TaskStatus.IN_PROGRESS,
-            "Done": TaskStatus.DONE,
-        }
-        return mapping.get(notion_status, TaskStatus.TODO)
+        return _NOTION_TO_STATUS.get(notion_status, TaskStatus.TODO)
 
     def _map_priority_to_notion(self, priority: TaskPriority) -> str:
         """映射优先级到 Notion"""
-        mapping = {
-            TaskPriority.LOW: "Low",
-            TaskPriority.MEDIUM: "Medium",
-            TaskPriority.HIGH: "High",
-            TaskPriority.URGENT: "Urgent",
-        }
-        return mapping[priority]
+        return _PRIORITY_TO_NOTION[priority]
 
     def _map_notion_to_priority(self, notion_priority: str) -> TaskPriority:
         """映射 Notion 优先级到内部优先级"""
-        mapping = {
-            "Low": TaskPriority.LOW,
-            "Medium": TaskPriority.MEDIUM,
-            "High": TaskPriority.HIGH,
-            "Urgent": TaskPriority.URGENT,
-        }
-        return mapping.get(notion_priority, TaskPriority.MEDIUM)
+        return _NOTION_TO_PRIORITY.get(notion_priority, TaskPriority.MEDIUM)
 
     def save(self, task: Task) -> Task:
         """保存或更新任务"""
+        self._invalidate_query_cache()
         properties = self._task_to_properties(task)
 
         if task.id:
@@ -243,8 +311,141 @@ class NotionRepository(TaskRepositoryInterface):
         except Exception:
             return None
 
+    def get_many(self, task_ids: List[str]) -> List[Task]:
+        """并发获取多个任务，忽略不存在的 ID"""
+        if len(task_ids) <= 1:
+            return super().get_many(task_ids)
+
+        if len(task_ids) > _GET_MANY_SCAN_THRESHOLD:
+            return self._scan_many(task_ids)
+
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+            tasks = list(executor.map(self.get_by_id, task_ids))
+        return [task for task in tasks if task is not None]
+
+    def _scan_many(self, task_ids: List[str]) -> List[Task]:
+        """分页扫描数据库获取多个任务，全部找到后提前结束（已归档的任务不会返回）"""
+        wanted = set(task_ids)
+        found = {}
+        for task in self._iter_query():
+            if task.id in wanted:
+                found[task.id] = task
+                if len(found) == len(wanted):
+                    break
+        return [found[task_id] for task_id in task_ids if task_id in found]
+
+    def save_many(self, tasks: List[Task]) -> List[Task]:
+        """并发保存或更新多个任务，结果顺序与 tasks 一致"""
+        if len(tasks) <= 1:
+            return super().save_many(tasks)
+
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+            return list(executor.map(self.save, tasks))
+
+    def delete_many(self, task_ids: List[str]) -> int:
+        """并发删除（归档）多个任务，返回成功删除的数量"""
+        if len(task_ids) <= 1:
+            return super().delete_many(task_ids)
+
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+            return sum(executor.map(self.delete, task_ids))
+
     def list_all(self, status: Optional[TaskStatus] = None) -> List[Task]:
         """列出所有任务，可按状态筛选"""
+        return list(self.iter_all(status))
+
+    def iter_all(self, status: Optional[TaskStatus] = None) -> Iterator[Task]:
+        """逐个产出任务，自动跟随 next_cursor 分页"""
+        notion_filter = None
+        if status:
+            notion_filter = {
+                "property": "Status",
+                "select": {
+                    "equals": self._map_status_to_notion(status)
+                }
+            }
+        return self._iter_query(notion_filter)
+
+    def filter_tasks(self, task_filter: TaskFilter) -> List[Task]:
+        """高级过滤任务
+
+        过滤条件转换为 Notion 查询的 filter 由服务端筛选，只拉取匹配的页面；
+        返回前再在本地精确过滤一次（时间边界等以本地计算为准）
+        """
+        conditions = self._filter_conditions(task_filter)
+        if not conditions:
+            notion_filter = None
+        elif len(conditions) == 1:
+            notion_filter = conditions[0]
+        else:
+            notion_filter = {"and": conditions}
+
+        now = Task._get_now_aware()
+        return [
+            task for task in self._iter_query(notion_filter)
+            if self._filter_single_task(task, task_filter, now)
+        ]
+
+    def _filter_conditions(self, task_filter: TaskFilter) -> List[dict]:
+        """将过滤条件转换为 Notion filter 条件列表"""
+        conditions = []
+
+        if task_filter.status:
+            conditions.append({
+                "property": "Status",
+                "select": {"equals": self._map_status_to_notion(task_filter.status)}
+            })
+
+        if task_filter.priority:
+            conditions.append({
+                "property": "Priority",
+                "select": {"equals": self._map_priority_to_notion(task_filter.priority)}
+            })
+
+        if task_filter.project:
+            conditions.append({
+                "property": "Project",
+                "select": {"equals": task_filter.project}
+            })
+
+        if task_filter.tags:
+            tag_conditions = [
+                {"property": "Tags", "multi_select": {"contains": tag}}
+                for tag in task_filter.tags
+            ]
+            if task_filter.tags_operator == "AND":
+                conditions.extend(tag_conditions)
+            elif len(tag_conditions) == 1:
+                conditions.append(tag_conditions[0])
+            else:
+                conditions.append({"or": tag_conditions})
+
+        now = datetime.now(timezone.utc)
+
+        if task_filter.overdue_only:
+            conditions.append({
+                "property": "Due Date",
+                "date": {"before": now.isoformat()}
+            })
+            conditions.append({
+                "property": "Status",
+                "select": {"does_not_equal": self._map_status_to_notion(TaskStatus.DONE)}
+            })
+
+        if task_filter.due_in_days is not None:
+            conditions.append({
+                "property": "Due Date",
+                "date": {"on_or_after": now.isoformat()}
+            })
+            conditions.append({
+                "property": "Due Date",
+                "date": {"before": (now + timedelta(days=task_filter.due_in_days + 1)).isoformat()}
+            })
+
+        return conditions
+
+    def _iter_query(self, notion_filter: Optional[dict] = None) -> Iterator[Task]:
+        """按 Notion filter 查询并逐个产出任务"""
         # 延迟获取 data_source_id（仅首次调用时会真正执行网络请求）
         self._ensure_data_source()
 
@@ -255,13 +456,8 @@ class NotionRepository(TaskRepositoryInterface):
         }
 
         # 添加过滤器
-        if status:
-            query_params["filter"] = {
-                "property": "Status",
-                "select": {
-                    "equals": self._map_status_to_notion(status)
-                }
-            }
+        if notion_filter:
+            query_params["filter"] = notion_filter
 
         # 添加排序
         query_params["sorts"] = [
@@ -272,32 +468,77 @@ class NotionRepository(TaskRepositoryInterface):
         ]
 
         try:
-            # 使用 data_sources.query API 并实现分页
-            tasks = []
-            has_more = True
-            start_cursor = None
-
-            # 分页获取所有结果
-            while has_more:
-                if start_cursor:
-                    query_params["start_cursor"] = start_cursor
+            if self.query_cache is None:
+                pages = self._iter_pages(query_params)
+            else:
+                pages = self._cached_pages(query_params)
 
-                response = self.client.data_sources.query(**query_params)
+            # map 只绑定一次解析方法，循环在 C 层执行
+            yield from map(self._properties_to_task, pages)
+        except Exception as e:
+            raise RuntimeError(f"查询 Notion 任务失败: {e}")
 
-                # 解析当前页的任务
-                for page in response.get("results", []):
-                    tasks.append(self._properties_to_task(page))
+    def _iter_pages(self, query_params: dict) -> Iterator[dict]:
+        """逐个产出原始页面数据，自动跟随 next_cursor 分页
 
-                # 检查是否有更多页
-                has_more = response.get("has_more", False)
-                start_cursor = response.get("next_cursor")
+        调用方解析当前页的同时，在后台线程预取下一页
+        """
+        response = self._query_data_source(query_params)
+        executor = None
+        try:
+            while True:
+                # 检查是否有更多页，有则提前发出请求
+                future = None
+                if response.get("has_more", False) and response.get("next_cursor"):
+                    if executor is None:
+                        executor = ThreadPoolExecutor(max_workers=1)
+                    next_params = dict(query_params, start_cursor=response["next_cursor"])
+                    future = executor.submit(self._query_data_source, next_params)
+
+                yield from response.get("results", [])
+
+                if future is None:
+                    break
+                response = future.result()
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+    def _cached_pages(self, query_params: dict) -> List[dict]:
+        """优先使用缓存的查询结果
+
+        先查询整个数据库中最近修改的一条页面，如果其修改时间与缓存一致则直接返回缓存，
+        只需 1 次请求而不是完整分页。注意：其他客户端归档（删除）任务不会更新剩余页面的
+        修改时间，缓存中的已归档任务会保留到数据库下次有修改为止。
+        """
+        key = self.query_cache.make_key(query_params)
+        latest_edited = self._latest_edited_time()
+        cached = self.query_cache.get(key)
+        if cached is not None and cached[1] == latest_edited:
+            return cached[0]
+
+        pages = list(self._iter_pages(query_params))
+        self.query_cache.put(key, pages, latest_edited)
+        return pages
+
+    def _latest_edited_time(self) -> Optional[str]:
+        """获取数据库中最近一次修改的时间"""
+        response = self._query_data_source({
+            "data_source_id": self.data_source_id,
+            "page_size": 1,
+            "sorts": [{"timestamp": "last_edited_time", "direction": "descending"}],
+        })
+        results = response.get("results", [])
+        return results[0]["last_edited_time"] if results else None
 
-            return tasks
-        except Exception as e:
-            raise RuntimeError(f"查询 Notion 任务失败: {e}")
+    def _invalidate_query_cache(self):
+        """本进程有写操作时清空查询缓存"""
+        if self.query_cache is not None:
+            self.query_cache.clear()
 
     def delete(self, task_id: str) -> bool:
         """删除任务（归档到 Notion）"""
+        self._invalidate_query_cache()
         try:
             self.client.pages.update(
                 page_id=task_id,
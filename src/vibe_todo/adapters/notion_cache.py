@@ -0,0 +1,72 @@
+"""Notion 查询结果的本地缓存（SQLite）
+
+以查询参数的哈希为键，保存原始页面数据和写入时数据库最新的 last_edited_time。
+命中前由调用方用一次 page_size=1 的查询确认数据库没有更新的修改。
+"""
+import hashlib
+import json
+import sqlite3
+import time
+from typing import List, Optional, Tuple
+
+from .. import fastjson
+
+
+class NotionQueryCache:
+    """Notion 查询结果缓存"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite 缓存文件路径
+        """
+        self.path = path
+        self._execute(
+            "CREATE TABLE IF NOT EXISTS notion_cache ("
+            "key TEXT PRIMARY KEY, "
+            "pages BLOB NOT NULL, "
+            "max_last_edited_time TEXT, "
+            "inserted_at REAL NOT NULL)"
+        )
+
+    def _execute(self, sql: str, params: tuple = ()) -> Optional[tuple]:
+        """执行单条语句并提交，返回第一行结果"""
+        conn = sqlite3.connect(self.path)
+        try:
+            with conn:
+                return conn.execute(sql, params).fetchone()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(query_params: dict) -> str:
+        """根据查询参数生成缓存键"""
+        raw = json.dumps(query_params, sort_keys=True, ensure_ascii=False)
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[List[dict], Optional[str]]]:
+        """读取缓存，返回 (页面列表, 最新修改时间)，未命中返回 None"""
+        row = self._execute(
+            "SELECT pages, max_last_edited_time FROM notion_cache WHERE key = ?",
+            (key,),
+        )
+        if row is None:
+            return None
+        return fastjson.loads(row[0]), row[1]
+
+    def put(self, key: str, pages: List[dict], max_edited: Optional[str]):
+        """写入缓存
+
+        Args:
+            key: 缓存键
+            pages: 原始页面数据
+            max_edited: 查询前数据库中最新的修改时间
+        """
+        self._execute(
+            "INSERT OR REPLACE INTO notion_cache VALUES (?, ?, ?, ?)",
+            (key, fastjson.dumps_bytes(pages), max_edited, time.time()),
+        )
+
+    def clear(self):
+        """清空缓存（本进程有写操作时调用）"""
+        self._execute("DELETE FROM notion_cache")
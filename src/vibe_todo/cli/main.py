@@ -1,6 +1,7 @@
 """命令行接口 - 使用 Rich 美化输出"""
 import re
 from datetime import datetime
+from functools import lru_cache
 from itertools import groupby
 from typing import Dict, List, Optional
 
@@ -12,12 +13,12 @@ from rich.prompt import Confirm, Prompt
 from rich.table import Table
 from rich.text import Text
 
+from .. import __version__
 from ..adapters import TaskFilter
 from ..config import get_config
 from ..core import Task, TaskPriority, TaskService, TaskStatus
 from ..io import ImportConflictStrategy, TaskExporter, TaskImporter
 from ..io.formats import ExportFormat
-from ..storage.factory import create_repository
 from .views import (
     TaskCardView, TaskTimelineView, TaskBoardView,
     get_status_display, get_priority_display
@@ -26,8 +27,12 @@ from .views import (
 console = Console()
 
 
+@lru_cache(maxsize=1)
 def get_service() -> TaskService:
-    """获取任务服务实例"""
+    """获取任务服务实例（进程内复用，保持远程后端的连接池；测试中可调用 get_service.cache_clear()）"""
+    # 延迟导入：SQLAlchemy 的导入耗时约 200ms，--help、config 等命令用不到
+    from ..storage.factory import create_repository
+
     repository = create_repository()
     return TaskService(repository)
 
@@ -60,7 +65,8 @@ def sort_and_group_tasks(tasks: List[Task]) -> Dict[TaskStatus, List[Task]]:
 
 
 @click.group()
-@click.version_option(version="0.2.4")
+# 显式传入版本号，避免 click 通过 importlib.metadata 查询已安装包的版本
+@click.version_option(version=__version__)
 def cli():
     """Vibe Todo - 简洁实用的任务和工时管理工具"""
     pass
@@ -117,7 +123,7 @@ def add(title: str, description: str, priority: str, due: str, tags: str, projec
 def list(status: str, priority: str, project: str, tags: str, tags_operator: str,
          overdue: bool, due_in_days: int, view: str):
     """列出所有任务（按状态和优先级分组展示，支持高级筛选）"""
-    repo = create_repository()
+    repo = get_service().repository
 
     # 构建过滤条件
     task_filter = TaskFilter()
@@ -140,11 +146,12 @@ def list(status: str, priority: str, project: str, tags: str, tags_operator: str
     if due_in_days is not None:
         task_filter.due_in_days = due_in_days
 
-    # 使用过滤条件
-    if task_filter.has_any_filter():
-        tasks = repo.filter_tasks(task_filter)
-    else:
-        tasks = repo.list_all()
+    # 使用过滤条件（远程后端分页加载期间显示进度提示）
+    with console.status("[dim]正在加载任务...[/dim]"):
+        if task_filter.has_any_filter():
+            tasks = repo.filter_tasks(task_filter)
+        else:
+            tasks = repo.list_all()
 
     if not tasks:
         console.print("[dim]暂无任务[/dim]")
@@ -198,7 +205,7 @@ def list(status: str, priority: str, project: str, tags: str, tags_operator: str
                     due_date_str = task.due_date.strftime("%Y-%m-%d")
                     if task.is_overdue():
                         due_str = Text(due_date_str, style="red")
-                    elif task.days_until_due() is not None and task.days_until_due() <= 3:
+                    elif task.days_until_due() <= 3:
                         due_str = Text(due_date_str, style="yellow")
                     else:
                         due_str = due_date_str
@@ -242,7 +249,7 @@ def search(query: str, status: str, priority: str, project: str, tags: str,
     
     支持在标题、描述、标签和项目中搜索关键词，同时可以使用高级筛选条件。
     """
-    repo = create_repository()
+    repo = get_service().repository
 
     # 构建过滤条件
     task_filter = TaskFilter()
@@ -266,7 +273,8 @@ def search(query: str, status: str, priority: str, project: str, tags: str,
         task_filter.due_in_days = due_in_days
 
     # 执行搜索和过滤
-    tasks = repo.search_and_filter(query=query, task_filter=task_filter)
+    with console.status("[dim]正在搜索任务...[/dim]"):
+        tasks = repo.search_and_filter(query=query, task_filter=task_filter)
 
     if not tasks:
         console.print(f"[dim]未找到匹配 '{query}' 的任务[/dim]")
@@ -308,7 +316,7 @@ def search(query: str, status: str, priority: str, project: str, tags: str,
                 due_date_str = task.due_date.strftime("%Y-%m-%d")
                 if task.is_overdue():
                     due_str = Text(due_date_str, style="red")
-                elif task.days_until_due() is not None and task.days_until_due() <= 3:
+                elif task.days_until_due() <= 3:
                     due_str = Text(due_date_str, style="yellow")
                 else:
                     due_str = due_date_str
@@ -361,10 +369,11 @@ def show(task_id: str):
 [bold cyan]更新时间:[/bold cyan] {task.updated_at.strftime('%Y-%m-%d %H:%M')}
 """
 
+    days_left = task.days_until_due()
     if task.is_overdue():
         details += "\n[red bold]⚠️  任务已逾期！[/red bold]"
-    elif task.days_until_due() is not None and task.days_until_due() <= 3:
-        details += f"\n[yellow]⏰ 还有 {task.days_until_due()} 天到期[/yellow]"
+    elif days_left is not None and days_left <= 3:
+        details += f"\n[yellow]⏰ 还有 {days_left} 天到期[/yellow]"
 
     panel = Panel(
         details.strip(),
@@ -633,13 +642,25 @@ def parse_time_input(time_str: str) -> Optional[int]:
 
 
 @cli.command()
-@click.argument("task_id")  # 改为字符串
-def delete(task_id: str):
-    """删除任务"""
+@click.argument("task_ids", nargs=-1, required=True)  # 字符串，兼容多种后端的 ID
+@click.option("-y", "--yes", is_flag=True, help="跳过确认提示")
+def delete(task_ids, yes: bool):
+    """删除任务（可指定多个 ID，合并为一次批量删除）"""
     service = get_service()
 
+    if len(task_ids) > 1:
+        if not yes and not Confirm.ask(f"[yellow]确认删除 {len(task_ids)} 个任务？[/yellow]"):
+            console.print("[dim]已取消[/dim]")
+            return
+
+        count = service.batch_delete([task_id for task_id in task_ids])
+        console.print(f"[green]✓ 成功删除 {count} 个任务[/green]")
+        return
+
+    task_id = task_ids[0]
+
     # 使用 Rich 的确认提示
-    if not Confirm.ask(f"[yellow]确认删除任务 #{task_id}？[/yellow]"):
+    if not yes and not Confirm.ask(f"[yellow]确认删除任务 #{task_id}？[/yellow]"):
         console.print("[dim]已取消[/dim]")
         return
 
@@ -713,12 +734,14 @@ def config_show():
 @click.option("--db-path", help="SQLite 数据库路径")
 @click.option("--token", help="Notion Integration Token")
 @click.option("--database", help="Notion Database ID")
+@click.option("--cache-path", help="Notion 查询结果缓存文件路径（可选）")
 @click.option("--client-id", help="Microsoft Azure Client ID")
 @click.option("--list-id", help="Microsoft To Do List ID")
 def config_set_backend(backend_type: str, db_path: str, token: str, database: str,
-                       client_id: str, list_id: str):
+                       cache_path: str, client_id: str, list_id: str):
     """设置后端配置"""
     cfg = get_config()
+    get_service.cache_clear()  # 后端变更后不再复用旧的仓储实例
 
     if backend_type == "sqlite":
         if not db_path:
@@ -730,7 +753,10 @@ def config_set_backend(backend_type: str, db_path: str, token: str, database: st
         if not token or not database:
             console.print("[red]✗ Notion 后端需要 --token 和 --database 参数[/red]")
             return
-        cfg.set_backend("notion", token=token, database_id=database)
+        kwargs = {"token": token, "database_id": database}
+        if cache_path:
+            kwargs["cache_path"] = cache_path
+        cfg.set_backend("notion", **kwargs)
         console.print("[green]✓ 已切换到 Notion 后端[/green]")
 
     elif backend_type == "microsoft":
@@ -838,22 +864,23 @@ def batch():
 def batch_done(task_ids):
     """批量标记任务为完成"""
     service = get_service()
-    count = service.batch_update_status(list(task_ids), TaskStatus.DONE)
+    count = service.batch_update_status([task_id for task_id in task_ids], TaskStatus.DONE)
     console.print(f"[green]✓ 成功标记 {count} 个任务为完成[/green]")
 
 
 @batch.command(name="delete")
 @click.argument("task_ids", nargs=-1, required=True)
-def batch_delete(task_ids):
+@click.option("-y", "--yes", is_flag=True, help="跳过确认提示")
+def batch_delete(task_ids, yes: bool):
     """批量删除任务"""
     service = get_service()
 
     # 确认删除
-    if not Confirm.ask(f"[yellow]确定要删除 {len(task_ids)} 个任务吗？[/yellow]"):
+    if not yes and not Confirm.ask(f"[yellow]确定要删除 {len(task_ids)} 个任务吗？[/yellow]"):
         console.print("[cyan]已取消[/cyan]")
         return
 
-    count = service.batch_delete(list(task_ids))
+    count = service.batch_delete([task_id for task_id in task_ids])
     console.print(f"[green]✓ 成功删除 {count} 个任务[/green]")
 
 
@@ -864,7 +891,7 @@ def batch_tag(task_ids, tags: str):
     """批量添加标签（用逗号分隔多个标签）"""
     service = get_service()
     tag_list = [t.strip() for t in tags.split(",")]
-    count = service.batch_add_tags(list(task_ids), tag_list)
+    count = service.batch_add_tags([task_id for task_id in task_ids], tag_list)
     console.print(f"[green]✓ 成功为 {count} 个任务添加标签: {', '.join(tag_list)}[/green]")
 
 
@@ -880,7 +907,7 @@ def batch_priority(task_ids, priority_level: str):
         "high": TaskPriority.HIGH,
         "urgent": TaskPriority.URGENT,
     }
-    count = service.batch_update_priority(list(task_ids), priority_map[priority_level])
+    count = service.batch_update_priority([task_id for task_id in task_ids], priority_map[priority_level])
     console.print(f"[green]✓ 成功设置 {count} 个任务的优先级为: {priority_level}[/green]")
 
 
@@ -890,7 +917,7 @@ def batch_priority(task_ids, priority_level: str):
 def batch_project(task_ids, project_name: str):
     """批量设置项目"""
     service = get_service()
-    count = service.batch_update_project(list(task_ids), project_name)
+    count = service.batch_update_project([task_id for task_id in task_ids], project_name)
     console.print(f"[green]✓ 成功设置 {count} 个任务的项目为: {project_name}[/green]")
 
 
@@ -20,27 +20,34 @@ from ..core.models import Task, TaskStatus, TaskPriority
 console = Console()
 
 
+# 状态/优先级的显示文本和颜色
+_STATUS_DISPLAY = {
+    TaskStatus.TODO: ("⭕ 待处理", "cyan"),
+    TaskStatus.IN_PROGRESS: ("🔄 进行中", "yellow"),
+    TaskStatus.DONE: ("✅ 已完成", "green"),
+}
+
+_PRIORITY_DISPLAY = {
+    TaskPriority.LOW: ("🟢 低", "green"),
+    TaskPriority.MEDIUM: ("🟡 中", "yellow"),
+    TaskPriority.HIGH: ("🟠 高", "orange1"),
+    TaskPriority.URGENT: ("🔴 紧急", "red bold"),
+}
+
+
+# 只有 7 种组合，预先构造 Text 并在各行之间共享（只读，需要修改时请先 .copy()）
+_STATUS_TEXT = {status: Text(text, style=color) for status, (text, color) in _STATUS_DISPLAY.items()}
+_PRIORITY_TEXT = {priority: Text(text, style=color) for priority, (text, color) in _PRIORITY_DISPLAY.items()}
+
+
 def get_status_display(status: TaskStatus) -> Text:
-    """获取状态的富文本显示"""
-    status_map = {
-        TaskStatus.TODO: ("⭕ 待处理", "cyan"),
-        TaskStatus.IN_PROGRESS: ("🔄 进行中", "yellow"),
-        TaskStatus.DONE: ("✅ 已完成", "green"),
-    }
-    text, color = status_map[status]
-    return Text(text, style=color)
+    """获取状态的富文本显示（共享实例，不要修改）"""
+    return _STATUS_TEXT[status]
 
 
 def get_priority_display(priority: TaskPriority) -> Text:
-    """获取优先级的富文本显示"""
-    priority_map = {
-        TaskPriority.LOW: ("🟢 低", "green"),
-        TaskPriority.MEDIUM: ("🟡 中", "yellow"),
-        TaskPriority.HIGH: ("🟠 高", "orange1"),
-        TaskPriority.URGENT: ("🔴 紧急", "red bold"),
-    }
-    text, color = priority_map[priority]
-    return Text(text, style=color)
+    """获取优先级的富文本显示（共享实例，不要修改）"""
+    return _PRIORITY_TEXT[priority]
 
 
 class TaskCardView:
@@ -56,6 +56,11 @@ class TaskPriority(Enum):
 class Task:
     """任务模型 - 兼容 Notion、Microsoft To Do 等服务"""
 
+    __slots__ = (
+        "id", "title", "description", "status", "time_spent",
+        "created_at", "updated_at", "due_date", "priority", "tags", "project",
+    )
+
     def __init__(
         self,
         title: str,
@@ -120,20 +125,28 @@ class Task:
             return f"{hours}h {minutes}m"
         return f"{minutes}m"
 
-    def is_overdue(self) -> bool:
-        """检查是否逾期"""
+    def is_overdue(self, now: Optional[datetime] = None) -> bool:
+        """检查是否逾期
+
+        Args:
+            now: 当前时间（带时区，批量判断时由调用方传入，避免重复获取）
+        """
         if self.due_date and self.status != TaskStatus.DONE:
             # 统一处理时区问题
-            now = self._get_now_aware()
+            now = now or self._get_now_aware()
             due = self._make_aware(self.due_date)
             return now > due
         return False
 
-    def days_until_due(self) -> Optional[int]:
-        """距离截止日期的天数"""
+    def days_until_due(self, now: Optional[datetime] = None) -> Optional[int]:
+        """距离截止日期的天数
+
+        Args:
+            now: 当前时间（带时区，批量判断时由调用方传入，避免重复获取）
+        """
         if self.due_date:
             # 统一处理时区问题
-            now = self._get_now_aware()
+            now = now or self._get_now_aware()
             due = self._make_aware(self.due_date)
             delta = due - now
             return delta.days
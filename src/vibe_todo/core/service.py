@@ -51,6 +51,10 @@ class TaskService:
         """获取指定任务"""
         return self.repository.get_by_id(task_id)
 
+    def get_tasks(self, task_ids: List) -> List[Task]:
+        """批量获取任务（忽略无效 ID），远程后端会合并或并发请求"""
+        return self.repository.get_many(task_ids)
+
     def list_tasks(self, status: Optional[TaskStatus] = None) -> List[Task]:
         """列出任务，可按状态筛选"""
         return self.repository.list_all(status=status)
@@ -132,59 +136,43 @@ class TaskService:
 
     def batch_update_status(self, task_ids: List[str], status: TaskStatus) -> int:
         """批量更新任务状态"""
-        success_count = 0
-        for task_id in task_ids:
-            task = self.repository.get_by_id(task_id)
-            if task:
-                task.status = status
-                task.updated_at = datetime.now()
-                self.repository.save(task)
-                success_count += 1
-        return success_count
+        tasks = self.get_tasks(task_ids)
+        for task in tasks:
+            task.status = status
+            task.updated_at = datetime.now()
+        self.repository.save_many(tasks)
+        return len(tasks)
 
     def batch_delete(self, task_ids: List[str]) -> int:
         """批量删除任务"""
-        success_count = 0
-        for task_id in task_ids:
-            if self.repository.delete(task_id):
-                success_count += 1
-        return success_count
+        return self.repository.delete_many(task_ids)
 
     def batch_add_tags(self, task_ids: List[str], tags: List[str]) -> int:
         """批量添加标签"""
-        success_count = 0
-        for task_id in task_ids:
-            task = self.repository.get_by_id(task_id)
-            if task:
-                # 合并标签（去重）
-                existing_tags = set(task.tags or [])
-                new_tags = existing_tags.union(set(tags))
-                task.tags = list(new_tags)
-                task.updated_at = datetime.now()
-                self.repository.save(task)
-                success_count += 1
-        return success_count
+        tasks = self.get_tasks(task_ids)
+        for task in tasks:
+            # 合并标签（去重）
+            existing_tags = set(task.tags or [])
+            new_tags = existing_tags.union(set(tags))
+            task.tags = list(new_tags)
+            task.updated_at = datetime.now()
+        self.repository.save_many(tasks)
+        return len(tasks)
 
     def batch_update_priority(self, task_ids: List[str], priority: TaskPriority) -> int:
         """批量设置优先级"""
-        success_count = 0
-        for task_id in task_ids:
-            task = self.repository.get_by_id(task_id)
-            if task:
-                task.priority = priority
-                task.updated_at = datetime.now()
-                self.repository.save(task)
-                success_count += 1
-        return success_count
+        tasks = self.get_tasks(task_ids)
+        for task in tasks:
+            task.priority = priority
+            task.updated_at = datetime.now()
+        self.repository.save_many(tasks)
+        return len(tasks)
 
     def batch_update_project(self, task_ids: List[str], project: str) -> int:
         """批量设置项目"""
-        success_count = 0
-        for task_id in task_ids:
-            task = self.repository.get_by_id(task_id)
-            if task:
-                task.project = project
-                task.updated_at = datetime.now()
-                self.repository.save(task)
-                success_count += 1
-        return success_count
+        tasks = self.get_tasks(task_ids)
+        for task in tasks:
+            task.project = project
+            task.updated_at = datetime.now()
+        self.repository.save_many(tasks)
+        return len(tasks)
@@ -0,0 +1,40 @@
+"""JSON 编解码 - 优先使用 orjson，未安装时回退到标准库 json
+
+安装可选依赖: uv pip install -e ".[speedups]"
+"""
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 取决于运行环境
+    orjson = None
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """解析 JSON 字符串或字节串"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, pretty: bool = False) -> str:
+    """序列化为 JSON 字符串（保留非 ASCII 字符）
+
+    Args:
+        obj: 要序列化的对象
+        pretty: 是否使用 2 空格缩进
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if pretty else 0
+        return orjson.dumps(obj, option=option).decode("utf-8")
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """序列化为紧凑的 UTF-8 JSON 字节串（用于 HTTP 请求体）"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
@@ -1,4 +1,11 @@
 """数据持久化模块"""
-from .repository import TaskRepository
 
 __all__ = ["TaskRepository"]
+
+
+def __getattr__(name):
+    # 延迟导入 SQLAlchemy 仓储，使用 Notion/Microsoft 后端时无需加载
+    if name == "TaskRepository":
+        from .repository import TaskRepository
+        return TaskRepository
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,7 +1,6 @@
 """仓储工厂 - 根据配置创建对应的仓储实例"""
 from ..adapters import TaskRepositoryInterface
 from ..config import get_config
-from .repository import TaskRepository
 
 
 def create_repository() -> TaskRepositoryInterface:
@@ -16,6 +15,7 @@ def create_repository() -> TaskRepositoryInterface:
 
     if backend_type == "sqlite":
         # SQLite 本地存储
+        from .repository import TaskRepository
         backend_config = config.get_backend_config("sqlite")
         db_path = backend_config.get("db_path", "vibe_todo.db")
         return TaskRepository(db_path=db_path)
@@ -38,7 +38,8 @@ def create_repository() -> TaskRepositoryInterface:
         return NotionRepository(
             token=token,
             database_id=database_id,
-            cached_data_source_id=cached_data_source_id
+            cached_data_source_id=cached_data_source_id,
+            cache_path=backend_config.get("cache_path")
         )
 
     elif backend_type == "microsoft":
@@ -48,6 +49,7 @@ def create_repository() -> TaskRepositoryInterface:
 
         client_id = backend_config.get("client_id")
         list_id = backend_config.get("list_id")
+        cached_list_id = backend_config.get("default_list_id")  # 获取缓存的默认列表 ID
 
         if not client_id:
             raise ValueError(
@@ -55,7 +57,11 @@ def create_repository() -> TaskRepositoryInterface:
                 "请运行: vibe config set-backend microsoft --client-id <id>"
             )
 
-        return MicrosoftRepository(client_id=client_id, list_id=list_id)
+        return MicrosoftRepository(
+            client_id=client_id,
+            list_id=list_id,
+            cached_list_id=cached_list_id
+        )
 
     else:
         raise ValueError(
@@ -278,19 +278,19 @@ class TaskRepository(TaskRepositoryInterface):
                     tag_filters = [TaskModel.tags.contains(tag) for tag in task_filter.tags]
                     query = query.filter(or_(*tag_filters))
 
+            # 截止日期相关条件：先在 SQL 中排除不可能匹配的行，减少需要转换的对象
+            if task_filter.overdue_only or task_filter.due_in_days is not None:
+                query = query.filter(TaskModel.due_date.isnot(None))
+            if task_filter.overdue_only:
+                query = query.filter(TaskModel.status != TaskStatus.DONE)
+
             db_tasks = query.order_by(TaskModel.created_at.desc()).all()
             tasks = [db_task.to_domain() for db_task in db_tasks]
 
-            # 内存过滤（处理需要 Python 逻辑的条件）
-            if task_filter.overdue_only:
-                tasks = [t for t in tasks if t.is_overdue()]
-
-            if task_filter.due_in_days is not None:
-                tasks = [
-                    t for t in tasks
-                    if t.due_date and t.days_until_due() is not None
-                    and 0 <= t.days_until_due() <= task_filter.due_in_days
-                ]
+            # 内存过滤（处理需要 Python 逻辑的条件），单遍完成且只获取一次当前时间
+            if task_filter.overdue_only or task_filter.due_in_days is not None:
+                now = Task._get_now_aware()
+                tasks = [t for t in tasks if self._filter_single_task(t, task_filter, now)]
 
             return tasks
         finally:
@@ -75,6 +75,20 @@ class TestTask:
         assert task.format_time_spent() == "2h 15m"
 
 
+    def test_overdue_with_given_now(self):
+        """测试传入当前时间判断逾期和剩余天数"""
+        from datetime import datetime, timezone
+
+        task = Task(title="测试", due_date=datetime(2024, 1, 10, tzinfo=timezone.utc))
+        before = datetime(2024, 1, 5, tzinfo=timezone.utc)
+        after = datetime(2024, 1, 11, tzinfo=timezone.utc)
+
+        assert not task.is_overdue(before)
+        assert task.is_overdue(after)
+        assert task.days_until_due(before) == 5
+        task.mark_done()
+        assert not task.is_overdue(after)
+
 class TestTaskService:
     """测试 TaskService"""
 
@@ -0,0 +1,33 @@
+"""测试 JSON 编解码工具"""
+import json
+
+from vibe_todo import fastjson
+
+
+class TestFastJson:
+    """测试 fastjson 的 loads/dumps"""
+
+    def test_roundtrip(self):
+        data = {"title": "任务", "tags": ["a", "b"], "count": 3, "due": None}
+        assert fastjson.loads(fastjson.dumps(data)) == data
+
+    def test_loads_bytes(self):
+        assert fastjson.loads('{"a": 1}'.encode("utf-8")) == {"a": 1}
+
+    def test_dumps_keeps_unicode(self):
+        assert "任务" in fastjson.dumps({"title": "任务"})
+
+    def test_dumps_pretty(self):
+        text = fastjson.dumps({"a": 1}, pretty=True)
+        assert "\n  " in text
+        assert json.loads(text) == {"a": 1}
+
+    def test_dumps_bytes_utf8(self):
+        assert fastjson.dumps_bytes({"title": "任务"}) == '{"title":"任务"}'.encode("utf-8")
+
+    def test_stdlib_fallback(self, monkeypatch):
+        monkeypatch.setattr(fastjson, "orjson", None)
+        text = fastjson.dumps({"title": "任务"})
+        assert text == '{"title":"任务"}'
+        assert fastjson.dumps_bytes({"title": "任务"}) == text.encode("utf-8")
+        assert fastjson.loads(text) == {"title": "任务"}
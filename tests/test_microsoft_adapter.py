@@ -0,0 +1,332 @@
+"""Microsoft To Do 适配器测试
+
+注意：
+- 这些测试通过 mock 模拟 Microsoft Graph API 的行为
+- 如果 msal/requests 未安装，整个测试文件会被跳过
+- 测试不会实际连接 Microsoft Graph
+- 安装可选依赖: uv pip install -e ".[microsoft]"
+"""
+import json
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from vibe_todo.core.models import Task, TaskStatus
+
+# 尝试导入，如果失败则跳过整个模块
+try:
+    import msal  # noqa: F401
+    import requests  # noqa: F401
+
+    from vibe_todo.adapters.microsoft_adapter import MicrosoftRepository
+    MICROSOFT_AVAILABLE = True
+except ImportError:
+    MICROSOFT_AVAILABLE = False
+    MicrosoftRepository = None
+
+pytestmark = pytest.mark.skipif(
+    not MICROSOFT_AVAILABLE,
+    reason="msal/requests not installed (optional dependency)"
+)
+
+
+def _mstodo_task(task_id: str, title: str, status: str = "notStarted") -> dict:
+    """创建模拟的 Microsoft To Do 任务"""
+    return {
+        "id": task_id,
+        "title": title,
+        "status": status,
+        "importance": "normal",
+        "createdDateTime": "2024-01-01T00:00:00Z",
+        "lastModifiedDateTime": "2024-01-01T00:00:00Z",
+    }
+
+
+def _posted_json(call) -> dict:
+    """解析 mock 请求调用中发送的 JSON 请求体"""
+    return json.loads(call[1]["data"])
+
+
+def _mock_response(status_code: int = 200, json_data: dict = None) -> Mock:
+    """创建模拟的 HTTP 响应"""
+    response = Mock()
+    response.status_code = status_code
+    response.json.return_value = json_data or {}
+    response.text = ""
+    return response
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """跳过 OAuth 认证的仓储实例"""
+    with patch('msal.PublicClientApplication'), \
+         patch.object(MicrosoftRepository, '_authenticate'):
+        repository = MicrosoftRepository(
+            client_id="test_client",
+            list_id="list-1",
+            token_cache_path=str(tmp_path / "token.json"),
+        )
+    repository.token = "test_token"
+    repository.session = Mock()
+    return repository
+
+
+class TestMicrosoftBatch:
+    """测试 $batch 批量请求"""
+
+    def test_save_many_single_batch(self, repo):
+        """测试批量保存合并为一次请求"""
+        tasks = [Task(title="新任务"), Task(title="已有任务", task_id="t2")]
+        repo.session.post.return_value = _mock_response(json_data={
+            "responses": [
+                # 子响应顺序与请求不一致
+                {"id": "1", "status": 200, "body": _mstodo_task("t2", "已有任务")},
+                {"id": "0", "status": 201, "body": _mstodo_task("t1", "新任务")},
+            ]
+        })
+
+        saved = repo.save_many(tasks)
+
+        assert repo.session.post.call_count == 1
+        payload = _posted_json(repo.session.post.call_args)
+        assert [r["method"] for r in payload["requests"]] == ["POST", "PATCH"]
+        assert payload["requests"][1]["url"] == "/me/todo/lists/list-1/tasks/t2"
+        assert [t.id for t in saved] == ["t1", "t2"]
+
+    def test_save_many_chunks_by_20(self, repo):
+        """测试超过 20 个任务时分批发送"""
+        tasks = [Task(title=f"任务{i}") for i in range(45)]
+
+        def fake_post(url, data, headers):
+            return _mock_response(json_data={
+                "responses": [
+                    {"id": r["id"], "status": 201,
+                     "body": _mstodo_task(f"id-{r['id']}", r["body"]["title"])}
+                    for r in json.loads(data)["requests"]
+                ]
+            })
+
+        repo.session.post.side_effect = fake_post
+
+        saved = repo.save_many(tasks)
+
+        assert repo.session.post.call_count == 3
+        assert [t.title for t in saved] == [t.title for t in tasks]
+
+    def test_save_many_sub_request_failure(self, repo):
+        """测试子请求失败时抛出异常"""
+        repo.session.post.return_value = _mock_response(json_data={
+            "responses": [{"id": "0", "status": 400, "body": {"error": "bad"}}]
+        })
+
+        with pytest.raises(RuntimeError):
+            repo.save_many([Task(title="任务")])
+
+    def test_get_many_skips_missing(self, repo):
+        """测试批量获取合并为一次请求，并忽略不存在的任务"""
+        repo.session.post.return_value = _mock_response(json_data={
+            "responses": [
+                {"id": "1", "status": 404, "body": {"error": "not found"}},
+                {"id": "0", "status": 200, "body": _mstodo_task("t1", "任务1")},
+                {"id": "2", "status": 200, "body": _mstodo_task("t3", "任务3")},
+            ]
+        })
+
+        tasks = repo.get_many(["t1", "missing", "t3"])
+
+        assert repo.session.post.call_count == 1
+        payload = _posted_json(repo.session.post.call_args)
+        assert all(r["method"] == "GET" for r in payload["requests"])
+        assert [t.id for t in tasks] == ["t1", "t3"]
+
+    def test_delete_many(self, repo):
+        """测试批量删除返回成功数量"""
+        repo.session.post.return_value = _mock_response(json_data={
+            "responses": [
+                {"id": "0", "status": 204},
+                {"id": "1", "status": 404},
+            ]
+        })
+
+        assert repo.delete_many(["t1", "missing"]) == 1
+        payload = _posted_json(repo.session.post.call_args)
+        assert all(r["method"] == "DELETE" for r in payload["requests"])
+
+
+class TestMicrosoftTokenCache:
+    """测试 token 缓存"""
+
+    def test_unexpired_token_skips_auth(self, tmp_path):
+        """测试未过期的缓存 token 直接使用，不访问网络"""
+        cache_path = tmp_path / "token.json"
+        cache_path.write_text(json.dumps({
+            "access_token": "cached_token",
+            "expires_at": time.time() + 600,
+        }))
+
+        with patch('msal.PublicClientApplication') as mock_app_class:
+            repo = MicrosoftRepository(
+                client_id="test_client",
+                list_id="list-1",
+                token_cache_path=str(cache_path),
+            )
+
+        assert repo.token == "cached_token"
+        assert repo.session.headers["Authorization"] == "Bearer cached_token"
+        mock_app_class.return_value.get_accounts.assert_not_called()
+
+    def test_expired_token_refreshes_silently(self, tmp_path):
+        """测试过期 token 通过 MSAL 静默刷新"""
+        cache_path = tmp_path / "token.json"
+        cache_path.write_text(json.dumps({
+            "access_token": "old_token",
+            "expires_at": time.time() - 1,
+        }))
+
+        with patch('msal.PublicClientApplication') as mock_app_class:
+            mock_app = mock_app_class.return_value
+            mock_app.get_accounts.return_value = [{"username": "me"}]
+            mock_app.acquire_token_silent.return_value = {
+                "access_token": "new_token",
+                "expires_in": 3600,
+            }
+            repo = MicrosoftRepository(
+                client_id="test_client",
+                list_id="list-1",
+                token_cache_path=str(cache_path),
+            )
+
+        assert repo.token == "new_token"
+        cached = json.loads(cache_path.read_text())
+        assert cached["access_token"] == "new_token"
+        assert cached["expires_at"] > time.time()
+
+
+    def test_401_forces_refresh_and_retries(self, repo):
+        """测试请求返回 401 时强制刷新 token 并重试一次"""
+        repo.session.get.side_effect = [
+            _mock_response(status_code=401),
+            _mock_response(json_data=_mstodo_task("t1", "任务")),
+        ]
+
+        with patch.object(MicrosoftRepository, '_authenticate') as mock_auth:
+            task = repo.get_by_id("t1")
+
+        mock_auth.assert_called_once_with(force=True)
+        assert repo.session.get.call_count == 2
+        assert task.id == "t1"
+
+
+class TestMicrosoftRetry:
+    """测试会话的重试策略"""
+
+    def test_post_retried_only_on_rate_limit(self):
+        """测试 POST 只在 429 时重试，GET 在服务端错误时也重试"""
+        from vibe_todo.adapters.microsoft_adapter import _build_retry
+
+        retry = _build_retry()
+        assert retry.is_retry("POST", 429)
+        assert not retry.is_retry("POST", 500)
+        assert retry.is_retry("GET", 503)
+        assert not retry.is_retry("GET", 404)
+
+    def test_exhausted_retry_returns_response(self):
+        """测试重试耗尽后返回响应而不是抛出 urllib3 异常"""
+        from vibe_todo.adapters.microsoft_adapter import _build_retry
+
+        retry = _build_retry()
+        assert retry.raise_on_status is False
+        assert not retry.new(total=0).is_retry("POST", 429)
+
+
+class TestMicrosoftListIdCache:
+    """测试默认列表 ID 缓存"""
+
+    def _create(self, tmp_path, **kwargs):
+        with patch('msal.PublicClientApplication'), \
+             patch.object(MicrosoftRepository, '_authenticate'):
+            return MicrosoftRepository(
+                client_id="test_client",
+                token_cache_path=str(tmp_path / "token.json"),
+                **kwargs,
+            )
+
+    def test_cached_list_id_skips_lookup(self, tmp_path):
+        """测试使用缓存的列表 ID 时不查询默认列表"""
+        with patch.object(MicrosoftRepository, '_get_default_list_id') as mock_lookup:
+            repo = self._create(tmp_path, cached_list_id="cached-list")
+
+        mock_lookup.assert_not_called()
+        assert repo._tasks_url.endswith("/me/todo/lists/cached-list/tasks")
+
+    def test_default_list_id_is_cached(self, tmp_path):
+        """测试查询到的默认列表 ID 写入配置"""
+        with patch.object(MicrosoftRepository, '_get_default_list_id', return_value="default-list"), \
+             patch('vibe_todo.config.get_config') as mock_get_config:
+            repo = self._create(tmp_path)
+
+        assert repo.list_id == "default-list"
+        mock_get_config.return_value.update_backend_config.assert_called_once_with(
+            "microsoft", default_list_id="default-list"
+        )
+
+    def test_stale_cached_list_id_refreshes(self, tmp_path):
+        """测试缓存的列表失效（404）时重新查询并重试"""
+        repo = self._create(tmp_path, cached_list_id="stale-list")
+        not_found = _mock_response(status_code=404)
+        ok = _mock_response()
+        ok.content = b'{"value": []}'
+        repo.session = Mock()
+        repo.session.get.side_effect = [not_found, ok]
+
+        with patch.object(MicrosoftRepository, '_get_default_list_id', return_value="new-list"), \
+             patch('vibe_todo.config.get_config'):
+            assert repo.list_all() == []
+
+        assert repo.list_id == "new-list"
+        assert "/me/todo/lists/new-list/tasks?" in repo.session.get.call_args[0][0]
+
+
+class TestMicrosoftMapping:
+    """测试数据格式转换"""
+
+    def test_list_all_status_filter_url(self, repo):
+        """测试按状态筛选时的请求 URL（含字段投影和分页大小）"""
+        response = _mock_response()
+        response.content = b'{"value": []}'
+        repo.session.get.return_value = response
+
+        assert repo.list_all(TaskStatus.DONE) == []
+        url = repo.session.get.call_args[0][0]
+        assert url.startswith("https://graph.microsoft.com/v1.0/me/todo/lists/list-1/tasks?")
+        assert "$filter=status%20eq%20'completed'" in url
+        assert "$top=100" in url
+        assert "$select=id,title,body," in url
+
+    def test_list_all_follows_next_link(self, repo):
+        """测试 list_all 跟随 @odata.nextLink 获取所有分页"""
+        page1 = _mock_response()
+        page1.content = json.dumps({
+            "value": [_mstodo_task("t1", "任务1"), _mstodo_task("t2", "任务2")],
+            "@odata.nextLink": "https://graph.microsoft.com/v1.0/next-page",
+        }).encode()
+        page2 = _mock_response()
+        page2.content = json.dumps({"value": [_mstodo_task("t3", "任务3")]}).encode()
+        repo.session.get.side_effect = [page1, page2]
+
+        tasks = repo.list_all()
+
+        assert [t.id for t in tasks] == ["t1", "t2", "t3"]
+        assert repo.session.get.call_args_list[1][0][0] == "https://graph.microsoft.com/v1.0/next-page"
+
+    def test_mstodo_to_task(self, repo):
+        task = repo._mstodo_to_task(_mstodo_task("t1", "任务", status="completed"))
+
+        assert task.id == "t1"
+        assert task.title == "任务"
+        assert task.status == TaskStatus.DONE
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -10,6 +10,9 @@ from unittest.mock import Mock, patch
 
 import pytest
 
+from vibe_todo.adapters import TaskFilter
+from vibe_todo.core.models import Task
+
 # 尝试导入，如果失败则跳过整个模块
 try:
     # 尝试导入 notion_client 来检查是否安装
@@ -151,6 +154,37 @@ class TestNotionCaching:
             # 验证：不应该调用 databases.retrieve
             mock_client.databases.retrieve.assert_not_called()
 
+    def test_stale_cached_data_source_id_refreshes(self):
+        """测试缓存的 data_source_id 失效时重新获取并写回配置"""
+        with patch('notion_client.Client') as mock_client_class, \
+             patch('vibe_todo.config.get_config') as mock_get_config:
+            mock_client = Mock()
+            mock_client_class.return_value = mock_client
+
+            not_found = Exception("object_not_found")
+            not_found.status = 404
+            mock_client.data_sources.query.side_effect = [
+                not_found,
+                {"results": [], "has_more": False, "next_cursor": None},
+            ]
+            mock_client.databases.retrieve.return_value = {
+                "data_sources": [{"id": "new-ds"}]
+            }
+
+            repo = NotionRepository(
+                token="test_token",
+                database_id="test_db_id",
+                cached_data_source_id="stale-ds"
+            )
+
+            assert repo.list_all() == []
+            assert repo.data_source_id == "new-ds"
+            second_call_kwargs = mock_client.data_sources.query.call_args_list[1][1]
+            assert second_call_kwargs["data_source_id"] == "new-ds"
+            mock_get_config.return_value.update_backend_config.assert_called_once_with(
+                "notion", data_source_id="new-ds"
+            )
+
     def test_fallback_to_database_id(self):
         """测试当没有 data_sources 字段时回退到 database_id"""
         with patch('notion_client.Client') as mock_client_class, \
@@ -177,6 +211,260 @@ class TestNotionCaching:
             assert repo.data_source_id == "test_db_id"
 
 
+class TestNotionConnectionPool:
+    """测试 HTTP 连接池共享"""
+
+    def test_repositories_share_http_client(self):
+        """测试多个仓储实例复用同一个 httpx 客户端"""
+        with patch('notion_client.Client') as mock_client_class:
+            NotionRepository(token="t1", database_id="db", cached_data_source_id="ds")
+            NotionRepository(token="t2", database_id="db", cached_data_source_id="ds")
+
+        first, second = mock_client_class.call_args_list
+        assert first[1]["client"] is second[1]["client"]
+
+
+class TestNotionFilterPushdown:
+    """测试过滤条件下推到 Notion 查询"""
+
+    def test_overdue_and_tags_filter_sent_to_server(self):
+        """测试逾期和标签条件转换为 Notion filter"""
+        with patch('notion_client.Client') as mock_client_class:
+            mock_client = Mock()
+            mock_client_class.return_value = mock_client
+            mock_client.data_sources.query.return_value = {"results": [], "has_more": False}
+
+            repo = NotionRepository(
+                token="test_token",
+                database_id="test_db_id",
+                cached_data_source_id="cached-id"
+            )
+
+            tasks = repo.filter_tasks(TaskFilter(tags=["a", "b"], overdue_only=True))
+
+            assert tasks == []
+            notion_filter = mock_client.data_sources.query.call_args[1]["filter"]
+            conditions = notion_filter["and"]
+            assert {"or": [
+                {"property": "Tags", "multi_select": {"contains": "a"}},
+                {"property": "Tags", "multi_select": {"contains": "b"}},
+            ]} in conditions
+            assert any(c.get("property") == "Due Date" and "before" in c["date"] for c in conditions)
+            assert {"property": "Status", "select": {"does_not_equal": "Done"}} in conditions
+
+    def test_local_filter_applied_after_query(self):
+        """测试服务端返回的结果仍按本地条件精确过滤"""
+        with patch('notion_client.Client') as mock_client_class:
+            mock_client = Mock()
+            mock_client_class.return_value = mock_client
+            props = TestNotionPagination._mock_task_properties("Task 1")
+            props["Tags"] = {"multi_select": [{"name": "a"}]}
+            mock_client.data_sources.query.return_value = {
+                "results": [
+                    {"id": "task1", "properties": props,
+                     "created_time": "2024-01-01T00:00:00Z", "last_edited_time": "2024-01-01T00:00:00Z"},
+                    {"id": "task2", "properties": TestNotionPagination._mock_task_properties("Task 2"),
+                     "created_time": "2024-01-01T00:00:00Z", "last_edited_time": "2024-01-01T00:00:00Z"},
+                ],
+                "has_more": False,
+            }
+
+            repo = NotionRepository(
+                token="test_token",
+                database_id="test_db_id",
+                cached_data_source_id="cached-id"
+            )
+
+            tasks = repo.filter_tasks(TaskFilter(tags=["a"]))
+
+            assert [t.id for t in tasks] == ["task1"]
+            assert mock_client.data_sources.query.call_args[1]["filter"] == {
+                "property": "Tags", "multi_select": {"contains": "a"}
+            }
+
+
+class TestNotionQueryCache:
+    """测试 Notion 查询结果缓存"""
+
+    @staticmethod
+    def _page(page_id: str, edited: str = "2024-01-01T00:00:00.000Z") -> dict:
+        return {"id": page_id,
+                "properties": TestNotionPagination._mock_task_properties(page_id),
+                "created_time": "2024-01-01T00:00:00.000Z", "last_edited_time": edited}
+
+    def _create(self, tmp_path, mock_client):
+        with patch('notion_client.Client', return_value=mock_client):
+            return NotionRepository(
+                token="test_token",
+                database_id="test_db_id",
+                cached_data_source_id="cached-id",
+                cache_path=str(tmp_path / "cache.db"),
+            )
+
+    def test_unchanged_database_uses_cache(self, tmp_path):
+        """测试数据库没有新修改时只发送一次探测请求"""
+        mock_client = Mock()
+        full = {"results": [self._page("task1"), self._page("task2")], "has_more": False}
+        probe = {"results": [self._page("task2")], "has_more": True}
+        mock_client.data_sources.query.side_effect = [probe, full, probe]
+
+        repo = self._create(tmp_path, mock_client)
+        assert [t.id for t in repo.list_all()] == ["task1", "task2"]
+        assert [t.id for t in repo.list_all()] == ["task1", "task2"]
+
+        # 探测 + 完整查询 + 探测
+        assert mock_client.data_sources.query.call_count == 3
+        assert mock_client.data_sources.query.call_args[1]["page_size"] == 1
+
+    def test_newer_edit_refetches(self, tmp_path):
+        """测试数据库有新修改时重新查询"""
+        mock_client = Mock()
+        old = self._page("task1")
+        new = self._page("task1", edited="2024-02-01T00:00:00.000Z")
+        mock_client.data_sources.query.side_effect = [
+            {"results": [old]}, {"results": [old]},
+            {"results": [new]}, {"results": [new]},
+        ]
+
+        repo = self._create(tmp_path, mock_client)
+        repo.list_all()
+        tasks = repo.list_all()
+
+        assert mock_client.data_sources.query.call_count == 4
+        assert tasks[0].updated_at.month == 2
+
+    def test_local_write_clears_cache(self, tmp_path):
+        """测试本进程的写操作清空缓存"""
+        mock_client = Mock()
+        repo = self._create(tmp_path, mock_client)
+        repo.query_cache.put("key", [self._page("task1")], "2024-01-01T00:00:00.000Z")
+
+        repo.delete("task1")
+
+        assert repo.query_cache.get("key") is None
+
+
+class TestNotionFastJson:
+    """测试 orjson 响应解析"""
+
+    def test_fast_json_parse_response(self, monkeypatch):
+        """测试成功响应通过 fastjson 解析，错误响应仍抛出 notion-client 异常"""
+        import httpx
+
+        from vibe_todo import fastjson
+        from vibe_todo.adapters.notion_adapter import _use_fast_json
+
+        if fastjson.orjson is None:
+            pytest.skip("orjson not installed")
+
+        def handler(request):
+            if request.url.path.endswith("/missing"):
+                return httpx.Response(404, json={"object": "error", "status": 404,
+                                                 "code": "object_not_found", "message": "nope"})
+            return httpx.Response(200, json={"object": "page", "id": "p1", "title": "任务"})
+
+        client = notion_client.Client(
+            auth="test_token", client=httpx.Client(transport=httpx.MockTransport(handler))
+        )
+        _use_fast_json(client)
+
+        calls = []
+        original_loads = fastjson.loads
+        monkeypatch.setattr(fastjson, "loads", lambda data: calls.append(data) or original_loads(data))
+
+        assert client.pages.retrieve(page_id="p1")["title"] == "任务"
+        assert len(calls) == 1
+
+        with pytest.raises(notion_client.APIResponseError):
+            client.pages.retrieve(page_id="missing")
+
+
+class TestNotionMapping:
+    """测试 Notion 页面转换"""
+
+    def test_timestamps_parsed_as_utc(self):
+        """测试 Notion 时间戳（毫秒 + Z）解析为带时区的 UTC 时间"""
+        from datetime import timezone
+
+        with patch('notion_client.Client'):
+            repo = NotionRepository(
+                token="test_token",
+                database_id="test_db_id",
+                cached_data_source_id="cached-id"
+            )
+
+        task = repo._properties_to_task({
+            "id": "task1",
+            "properties": TestNotionPagination._mock_task_properties("任务"),
+            "created_time": "2024-01-02T03:04:05.678Z",
+            "last_edited_time": "2024-01-02T03:04:05.000Z",
+        })
+
+        assert task.created_at.tzinfo == timezone.utc
+        assert (task.created_at.hour, task.created_at.microsecond) == (3, 678000)
+
+    def test_properties_to_task_missing_fields(self):
+        """测试缺失或为空的属性使用默认值"""
+        with patch('notion_client.Client'):
+            repo = NotionRepository(
+                token="test_token",
+                database_id="test_db_id",
+                cached_data_source_id="cached-id"
+            )
+
+        task = repo._properties_to_task({
+            "id": "task1",
+            "properties": {
+                "Name": {"title": [{"text": {"content": "任务"}}]},
+                "Status": {"select": None},
+                "Time Spent": {"number": None},
+                "Due Date": {"date": {"start": "2024-02-01T00:00:00Z"}},
+            },
+            "created_time": "2024-01-01T00:00:00Z",
+            "last_edited_time": "2024-01-01T00:00:00Z",
+        })
+
+        assert task.title == "任务"
+        assert task.description == ""
+        assert task.status.value == "todo"
+        assert task.priority.value == "medium"
+        assert task.time_spent == 0
+        assert task.due_date.year == 2024 and task.due_date.month == 2
+        assert task.tags == []
+        assert task.project is None
+
+    def test_task_to_properties(self):
+        """测试 Task 转换为 Notion 属性，空字段不写入可选属性"""
+        from datetime import datetime
+
+        from vibe_todo.core.models import TaskPriority, TaskStatus
+
+        with patch('notion_client.Client'):
+            repo = NotionRepository(
+                token="test_token",
+                database_id="test_db_id",
+                cached_data_source_id="cached-id"
+            )
+
+        props = repo._task_to_properties(Task(
+            title="完整", description="描述", status=TaskStatus.IN_PROGRESS,
+            priority=TaskPriority.URGENT, due_date=datetime(2024, 3, 1),
+            tags=["a", "b"], project="P", time_spent=30,
+        ))
+        assert props["Status"] == {"select": {"name": "In Progress"}}
+        assert props["Priority"] == {"select": {"name": "Urgent"}}
+        assert props["Description"]["rich_text"][0]["text"]["content"] == "描述"
+        assert props["Due Date"] == {"date": {"start": "2024-03-01T00:00:00"}}
+        assert props["Tags"] == {"multi_select": [{"name": "a"}, {"name": "b"}]}
+        assert props["Project"] == {"select": {"name": "P"}}
+        assert props["Time Spent"] == {"number": 30}
+
+        props = repo._task_to_properties(Task(title="空"))
+        assert props["Description"] == {"rich_text": []}
+        assert props["Status"] == {"select": {"name": "To Do"}}
+        assert not {"Due Date", "Tags", "Project"} & props.keys()
+
+
 class TestNotionPagination:
     """测试 Notion 适配器的分页功能"""
 
@@ -229,6 +517,86 @@ class TestNotionPagination:
             second_call_kwargs = mock_client.data_sources.query.call_args_list[1][1]
             assert second_call_kwargs["start_cursor"] == "cursor_123"
 
+    def test_get_many_keeps_order_and_skips_missing(self):
+        """测试并发批量获取保持顺序并忽略不存在的任务"""
+        with patch('notion_client.Client') as mock_client_class:
+            mock_client = Mock()
+            mock_client_class.return_value = mock_client
+
+            def fake_retrieve(page_id):
+                if page_id == "missing":
+                    raise Exception("not found")
+                return {"id": page_id, "properties": self._mock_task_properties(page_id),
+                        "created_time": "2024-01-01T00:00:00Z",
+                        "last_edited_time": "2024-01-01T00:00:00Z"}
+
+            mock_client.pages.retrieve.side_effect = fake_retrieve
+
+            repo = NotionRepository(
+                token="test_token",
+                database_id="test_db_id",
+                cached_data_source_id="cached-id"
+            )
+
+            tasks = repo.get_many(["task1", "missing", "task2", "task3"])
+
+            assert [t.id for t in tasks] == ["task1", "task2", "task3"]
+            assert mock_client.pages.retrieve.call_count == 4
+
+    def test_get_many_large_batch_scans_database(self):
+        """测试 ID 数超过单页大小时改为分页扫描，找齐后不再请求下一页"""
+        with patch('notion_client.Client') as mock_client_class:
+            mock_client = Mock()
+            mock_client_class.return_value = mock_client
+
+            def page(page_id):
+                return {"id": page_id, "properties": self._mock_task_properties(page_id),
+                        "created_time": "2024-01-01T00:00:00Z",
+                        "last_edited_time": "2024-01-01T00:00:00Z"}
+
+            mock_client.data_sources.query.return_value = {
+                "results": [page(f"task{i}") for i in range(150)],
+                "has_more": True,
+                "next_cursor": "cursor_123",
+            }
+
+            repo = NotionRepository(
+                token="test_token",
+                database_id="test_db_id",
+                cached_data_source_id="cached-id"
+            )
+
+            ids = [f"task{i}" for i in reversed(range(120))] + ["missing"]
+            tasks = repo.get_many(ids)
+
+            assert [t.id for t in tasks] == ids[:-1]
+            mock_client.pages.retrieve.assert_not_called()
+
+    def test_save_many_keeps_order(self):
+        """测试并发批量保存保持顺序"""
+        with patch('notion_client.Client') as mock_client_class:
+            mock_client = Mock()
+            mock_client_class.return_value = mock_client
+
+            def fake_create(parent, properties):
+                title = properties["Name"]["title"][0]["text"]["content"]
+                return {"id": f"id-{title}", "properties": properties,
+                        "created_time": "2024-01-01T00:00:00Z",
+                        "last_edited_time": "2024-01-01T00:00:00Z"}
+
+            mock_client.pages.create.side_effect = fake_create
+
+            repo = NotionRepository(
+                token="test_token",
+                database_id="test_db_id",
+                cached_data_source_id="cached-id"
+            )
+
+            saved = repo.save_many([Task(title=f"T{i}") for i in range(6)])
+
+            assert [t.id for t in saved] == [f"id-T{i}" for i in range(6)]
+            assert mock_client.pages.create.call_count == 6
+
     @staticmethod
     def _mock_task_properties(title: str):
         """创建模拟的任务属性"""
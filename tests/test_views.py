@@ -2,7 +2,10 @@
 import pytest
 from datetime import datetime, timedelta
 from src.vibe_todo.core.models import Task, TaskStatus, TaskPriority
-from src.vibe_todo.cli.views import TaskCardView, TaskTimelineView, TaskBoardView
+from src.vibe_todo.cli.views import (
+    TaskCardView, TaskTimelineView, TaskBoardView,
+    get_status_display, get_priority_display
+)
 
 
 @pytest.fixture
@@ -174,3 +177,28 @@ class TestTaskBoardView:
         view = TaskBoardView()
         result = view.render([])
         assert "暂无任务" in result or "empty" in result.lower()
+
+
+class TestDisplayText:
+    """测试状态/优先级富文本"""
+
+    def test_display_text_shared_and_unchanged_after_render(self):
+        """测试同一状态返回共享实例，多次渲染后内容不变"""
+        import io
+
+        from rich.console import Console
+        from rich.table import Table
+
+        status_text = get_status_display(TaskStatus.TODO)
+        assert get_status_display(TaskStatus.TODO) is status_text
+
+        table = Table()
+        table.add_column("状态")
+        table.add_column("优先级")
+        for _ in range(3):
+            table.add_row(status_text, get_priority_display(TaskPriority.URGENT))
+        Console(file=io.StringIO(), width=40).print(table)
+
+        assert status_text.plain == "⭕ 待处理"
+        assert str(status_text.style) == "cyan"
+        assert get_priority_display(TaskPriority.URGENT).plain == "🔴 紧急"